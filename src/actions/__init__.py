@@ -1,4 +1,5 @@
 from actions.factory import ActionFactory
 from actions.base import Action
+from actions.plan import LabelChangePlan
 
-__all__ = ['ActionFactory', 'Action']
\ No newline at end of file
+__all__ = ['ActionFactory', 'Action', 'LabelChangePlan']
\ No newline at end of file
@@ -7,6 +7,11 @@ class Action(ABC):
     def execute(self, email_id: str, gmail_client: Any, **kwargs) -> Dict:
         pass
 
+    def plan(self, label_plan: Any, **kwargs) -> bool:
+        # Return True when the action was folded into label_plan instead of
+        # needing its own execute() call. Actions that can't be merged keep this default.
+        return False
+
     @abstractmethod
     def get_name(self) -> str:
         pass
\ No newline at end of file
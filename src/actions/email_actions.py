@@ -11,6 +11,10 @@ class MarkAsReadAction(Action):
             'email_id': email_id
         }
 
+    def plan(self, label_plan: Any, **kwargs) -> bool:
+        label_plan.mark_read()
+        return True
+
     def get_name(self) -> str:
         return "mark_as_read"
 
@@ -24,6 +28,10 @@ class MarkAsUnreadAction(Action):
             'email_id': email_id
         }
 
+    def plan(self, label_plan: Any, **kwargs) -> bool:
+        label_plan.mark_unread()
+        return True
+
     def get_name(self) -> str:
         return "mark_as_unread"
 
@@ -39,5 +47,9 @@ class MoveMessageAction(Action):
             'label': label
         }
 
+    def plan(self, label_plan: Any, **kwargs) -> bool:
+        label_plan.add_label(kwargs.get('label', 'INBOX'))
+        return True
+
     def get_name(self) -> str:
         return "move_message"
\ No newline at end of file
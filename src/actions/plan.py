@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional
+
+
+# Net label change for a single email, built up from every matching rule and
+# applied with one Gmail `modify` call.
+#
+# Read/unread precedence: the last matching rule in rules-file order wins, which
+# is the same end state the rules would leave when executed one after another.
+# Labels added by move_message accumulate across rules.
+class LabelChangePlan:
+    def __init__(self, current_is_read: Optional[bool] = None):
+        self.current_is_read = current_is_read
+        self.read_state: Optional[bool] = None
+        self.labels: List[str] = []
+
+    def mark_read(self):
+        self.read_state = True
+
+    def mark_unread(self):
+        self.read_state = False
+
+    def add_label(self, label_name: str):
+        if label_name.lower() not in [label.lower() for label in self.labels]:
+            self.labels.append(label_name)
+
+    def changes_read_state(self) -> bool:
+        return self.read_state is not None and self.read_state != self.current_is_read
+
+    def is_empty(self) -> bool:
+        return not self.changes_read_state() and not self.labels
+
+    def apply(self, email_id: str, gmail_client: Any) -> Dict:
+        add_label_ids = []
+        remove_label_ids = []
+        missing_labels = []
+
+        if self.changes_read_state():
+            if self.read_state:
+                remove_label_ids.append('UNREAD')
+            else:
+                add_label_ids.append('UNREAD')
+
+        for label_name in self.labels:
+            label_id = gmail_client.get_label_id(label_name)
+            if label_id:
+                add_label_ids.append(label_id)
+            else:
+                missing_labels.append(label_name)
+
+        modified = True
+        if add_label_ids or remove_label_ids:
+            modified = gmail_client.modify_labels(email_id, add_label_ids, remove_label_ids)
+
+        result = {
+            'success': modified and not missing_labels,
+            'modified': modified,
+            'email_id': email_id,
+            'add_label_ids': add_label_ids,
+            'remove_label_ids': remove_label_ids
+        }
+        if missing_labels:
+            result['missing_labels'] = missing_labels
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            'read_state': self.read_state,
+            'labels': list(self.labels)
+        }
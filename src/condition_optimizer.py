@@ -0,0 +1,160 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from predicates.base import Predicate
+
+# Relative cost of reading/scanning each column; message bodies dominate.
+FIELD_COSTS = {
+    'date_received': 0.5,
+    'from_address': 1.0,
+    'subject': 1.5,
+    'to_addresses': 2.0,
+    'snippet': 2.0,
+    'message_body': 20.0,
+}
+
+PREDICATE_COSTS = {
+    'less_than_days': 0.5,
+    'greater_than_days': 0.5,
+    'less_than_months': 0.5,
+    'greater_than_months': 0.5,
+    'equals': 0.8,
+    'does_not_equal': 0.8,
+    'contains': 1.0,
+    'does_not_contain': 1.0,
+    'in_list': 1.5,
+    'domain_in': 2.0,
+    'matches_regex': 3.0,
+}
+
+
+class CompiledCondition:
+    __slots__ = ('key', 'field', 'predicate_name', 'predicate', 'value', 'cost')
+
+    def __init__(self, key: str, field: str, predicate_name: str, predicate: Optional[Predicate],
+                 value: Any, cost: float):
+        self.key = key
+        self.field = field
+        self.predicate_name = predicate_name
+        self.predicate = predicate
+        self.value = value
+        self.cost = cost
+
+
+class ConditionStats:
+    __slots__ = ('field', 'predicate', 'value', 'evaluations', 'matches')
+
+    def __init__(self, field: str, predicate: str, value: Any, evaluations: int = 0, matches: int = 0):
+        self.field = field
+        self.predicate = predicate
+        self.value = value
+        self.evaluations = evaluations
+        self.matches = matches
+
+    @property
+    def selectivity(self) -> float:
+        # Laplace smoothing keeps unseen conditions at 0.5 and never reaches 0 or 1.
+        return (self.matches + 1) / (self.evaluations + 2)
+
+    def to_dict(self) -> Dict:
+        return {
+            'field': self.field,
+            'predicate': self.predicate,
+            'value': self.value,
+            'evaluations': self.evaluations,
+            'matches': self.matches
+        }
+
+
+class ConditionOptimizer:
+    def __init__(self, stats_path: Optional[str] = None):
+        self.stats_path = stats_path
+        self.stats: Dict[str, ConditionStats] = {}
+        self.load()
+
+    @staticmethod
+    def condition_key(field: str, predicate_name: str, value: Any) -> str:
+        return json.dumps([field, predicate_name, value], sort_keys=True, default=str)
+
+    @staticmethod
+    def static_cost(field: str, predicate_name: str) -> float:
+        return FIELD_COSTS.get(field, 1.0) * PREDICATE_COSTS.get(predicate_name, 1.0)
+
+    def compile(self, field: str, predicate_name: str, predicate: Optional[Predicate],
+                raw_value: Any, prepared_value: Any) -> CompiledCondition:
+        key = self.condition_key(field, predicate_name, raw_value)
+        if key not in self.stats:
+            self.stats[key] = ConditionStats(field, predicate_name, raw_value)
+
+        # Conditions with an unknown predicate always evaluate to False and cost nothing.
+        cost = self.static_cost(field, predicate_name) if predicate else 0.0
+        return CompiledCondition(key, field, predicate_name, predicate, prepared_value, cost)
+
+    def order(self, compiled: List[CompiledCondition], predicate_type: str) -> List[CompiledCondition]:
+        # For "all" run cheap conditions that are likely to fail first; for "any" run
+        # cheap conditions that are likely to pass first. Either way the first decisive
+        # result ends evaluation.
+        def rank(condition: CompiledCondition) -> float:
+            if condition.predicate is None:
+                return 0.0 if predicate_type == 'all' else float('inf')
+
+            selectivity = self.stats[condition.key].selectivity
+            if predicate_type == 'all':
+                return condition.cost / (1 - selectivity)
+            return condition.cost / selectivity
+
+        return sorted(compiled, key=rank)
+
+    def record(self, condition: CompiledCondition, result: bool):
+        stats = self.stats[condition.key]
+        stats.evaluations += 1
+        if result:
+            stats.matches += 1
+
+    def describe(self, compiled: List[CompiledCondition]) -> List[Dict]:
+        plan = []
+        for position, condition in enumerate(compiled, 1):
+            stats = self.stats[condition.key]
+            plan.append({
+                'position': position,
+                'field': condition.field,
+                'predicate': condition.predicate_name,
+                'value': stats.value,
+                'static_cost': condition.cost,
+                'evaluations': stats.evaluations,
+                'matches': stats.matches,
+                'selectivity': round(stats.selectivity, 4)
+            })
+        return plan
+
+    def load(self):
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return
+
+        try:
+            with open(self.stats_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading condition stats from {self.stats_path}: {e}")
+            return
+
+        for key, entry in data.items():
+            self.stats[key] = ConditionStats(
+                entry.get('field', ''),
+                entry.get('predicate', ''),
+                entry.get('value'),
+                entry.get('evaluations', 0),
+                entry.get('matches', 0)
+            )
+
+    def save(self):
+        if not self.stats_path:
+            return
+
+        path = Path(self.stats_path)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({key: stats.to_dict() for key, stats in self.stats.items()}, f, default=str)
+        os.replace(tmp_path, path)
@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
-from db.models import Base
+from db.models import Base, DEFAULT_ACCOUNT
+from db.migrations import migrate_account_columns
+from db.profiles import get_profile
+from db.writer import SingleWriter
 import os
 from dotenv import load_dotenv
 
@@ -10,21 +13,23 @@ load_dotenv()
 class DatabaseManager:
     def __init__(self, database_url=None):
         self.database_url = database_url or os.getenv('DATABASE_URL', 'sqlite:///gmail_rules.db')
+        self.profile = get_profile(self.database_url)
 
         self.engine = create_engine(
             self.database_url,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
-            echo=False
+            echo=False,
+            **self.profile.engine_kwargs()
         )
+        self.profile.configure(self.engine)
         self.session_factory = sessionmaker(bind=self.engine)
         self.Session = scoped_session(self.session_factory)
+        self._writer = None
 
         # Auto-create tables if they don't exist
         self.create_tables()
 
     def create_tables(self):
+        migrate_account_columns(self.engine)
         Base.metadata.create_all(self.engine)
 
     def drop_tables(self):
@@ -33,5 +38,20 @@ class DatabaseManager:
     def get_session(self):
         return self.Session()
 
+    def get_writer(self) -> SingleWriter:
+        if self._writer is None:
+            self._writer = SingleWriter(self.session_factory, int(os.getenv('DB_WRITE_BATCH_SIZE', 500)))
+        return self._writer
+
+    def ingest_emails(self, emails_data, account=DEFAULT_ACCOUNT):
+        rows = [dict(email_data, account=account) for email_data in emails_data]
+        return self.get_writer().submit(lambda session: self.profile.bulk_upsert_emails(session, rows))
+
     def close_session(self):
-        self.Session.remove()
\ No newline at end of file
+        self.Session.remove()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self.close_session()
\ No newline at end of file
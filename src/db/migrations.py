@@ -0,0 +1,71 @@
+from sqlalchemy import inspect, text
+
+from db.models import DEFAULT_ACCOUNT, Email, RuleExecutionLog
+
+
+# Databases created before multi-account support have no `account` column and key
+# emails by `id` alone. Upgrade them in place, tagging existing rows with the default account.
+def migrate_account_columns(engine):
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+
+    if 'emails' in tables and 'account' not in _column_names(inspector, 'emails'):
+        if engine.dialect.name == 'sqlite':
+            _rebuild_sqlite_emails(engine, inspector)
+        elif engine.dialect.name == 'postgresql':
+            _migrate_postgres_emails(engine, inspector)
+        else:
+            raise RuntimeError(
+                "The emails table predates multi-account support and can't be migrated automatically on "
+                f"{engine.dialect.name}. Add an 'account' column (default '{DEFAULT_ACCOUNT}') and make "
+                "(account, id) the primary key."
+            )
+
+    if 'rule_execution_logs' in tables and 'account' not in _column_names(inspector, 'rule_execution_logs'):
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE rule_execution_logs ADD COLUMN account VARCHAR(255) DEFAULT '{DEFAULT_ACCOUNT}'"
+            ))
+            conn.execute(text(f"UPDATE rule_execution_logs SET account = '{DEFAULT_ACCOUNT}'"))
+            for index in RuleExecutionLog.__table__.indexes:
+                if 'account' in index.columns:
+                    index.create(conn)
+
+
+def _column_names(inspector, table_name):
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def _rebuild_sqlite_emails(engine, inspector):
+    # SQLite can't change a primary key in place, so copy the rows into a fresh table.
+    old_columns = _column_names(inspector, 'emails')
+    copied = [column.name for column in Email.__table__.columns if column.name in old_columns]
+    column_list = ', '.join(copied)
+
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE emails RENAME TO emails_old'))
+        index_names = conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'emails_old' AND sql IS NOT NULL"
+        )).scalars().all()
+        for index_name in index_names:
+            conn.execute(text(f'DROP INDEX "{index_name}"'))
+
+        Email.__table__.create(conn)
+        conn.execute(text(
+            f"INSERT INTO emails (account, {column_list}) SELECT '{DEFAULT_ACCOUNT}', {column_list} FROM emails_old"
+        ))
+        conn.execute(text('DROP TABLE emails_old'))
+
+
+def _migrate_postgres_emails(engine, inspector):
+    pk_name = inspector.get_pk_constraint('emails').get('name') or 'emails_pkey'
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"ALTER TABLE emails ADD COLUMN account VARCHAR(255) NOT NULL DEFAULT '{DEFAULT_ACCOUNT}'"
+        ))
+        conn.execute(text(f'ALTER TABLE emails DROP CONSTRAINT "{pk_name}"'))
+        conn.execute(text('ALTER TABLE emails ADD PRIMARY KEY (account, id)'))
+        for index in Email.__table__.indexes:
+            if 'account' in index.columns:
+                index.create(conn)
@@ -5,10 +5,13 @@ from datetime import datetime
 
 Base = declarative_base()
 
+DEFAULT_ACCOUNT = 'default'
+
 
 class Email(Base):
     __tablename__ = 'emails'
 
+    account = Column(String(255), primary_key=True, default=DEFAULT_ACCOUNT)
     id = Column(String(255), primary_key=True)
     thread_id = Column(String(255), index=True)
     from_address = Column(String(500), index=True)
@@ -31,16 +34,18 @@ class Email(Base):
         Index('idx_date_received_desc', date_received.desc()),
         Index('idx_from_date', from_address, date_received),
         Index('idx_subject_date', subject, date_received),
+        Index('idx_account_date', account, date_received),
     )
 
     def __repr__(self):
-        return f"<Email(id={self.id}, from={self.from_address}, subject={self.subject[:50]})>"
+        return f"<Email(account={self.account}, id={self.id}, from={self.from_address}, subject={self.subject[:50]})>"
 
 
 class RuleExecutionLog(Base):
     __tablename__ = 'rule_execution_logs'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    account = Column(String(255), default=DEFAULT_ACCOUNT, index=True)
     email_id = Column(String(255), index=True)
     rule_name = Column(String(255), index=True)
     rule_conditions = Column(JSON)
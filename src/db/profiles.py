@@ -0,0 +1,137 @@
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import event, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from db.models import Email
+
+# Columns written by bulk ingest; created_at/updated_at are managed by the database.
+INGEST_COLUMNS = [column.name for column in Email.__table__.columns if column.name not in ('created_at', 'updated_at')]
+
+
+class EngineProfile:
+    name = 'default'
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        return {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_pre_ping': True
+        }
+
+    def configure(self, engine):
+        pass
+
+    def bulk_upsert_emails(self, session: Session, emails_data: List[Dict]) -> int:
+        for email_data in emails_data:
+            session.merge(Email(**{key: value for key, value in email_data.items() if key in INGEST_COLUMNS}))
+        return len(emails_data)
+
+
+class SqliteProfile(EngineProfile):
+    name = 'sqlite'
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        # SQLite picks its own pool (pool_size isn't valid for in-memory databases); the
+        # writer thread needs connections that can be used outside the creating thread.
+        return {
+            'pool_pre_ping': True,
+            'connect_args': {'check_same_thread': False, 'timeout': 30}
+        }
+
+    def configure(self, engine):
+        mmap_size = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+        cache_size_kb = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+
+        @event.listens_for(engine, 'connect')
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # WAL lets readers run alongside the writer; NORMAL skips the fsync on every commit.
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute(f'PRAGMA mmap_size={mmap_size}')
+            cursor.execute(f'PRAGMA cache_size=-{cache_size_kb}')
+            cursor.execute('PRAGMA busy_timeout=30000')
+            cursor.close()
+
+    def bulk_upsert_emails(self, session: Session, emails_data: List[Dict]) -> int:
+        if not emails_data:
+            return 0
+
+        rows = [{column: email_data.get(column) for column in INGEST_COLUMNS} for email_data in emails_data]
+        stmt = sqlite_insert(Email.__table__)
+        update_columns = {column: stmt.excluded[column] for column in INGEST_COLUMNS if column not in ('account', 'id')}
+        update_columns['updated_at'] = func.now()
+        session.execute(stmt.on_conflict_do_update(index_elements=['account', 'id'], set_=update_columns), rows)
+        return len(rows)
+
+
+class PostgresProfile(EngineProfile):
+    name = 'postgresql'
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        return {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': True
+        }
+
+    def bulk_upsert_emails(self, session: Session, emails_data: List[Dict]) -> int:
+        if not emails_data:
+            return 0
+
+        # COPY into a temp staging table, then upsert from it in one statement.
+        buffer = io.StringIO()
+        for email_data in emails_data:
+            buffer.write('\t'.join(_copy_value(email_data.get(column)) for column in INGEST_COLUMNS) + '\n')
+        buffer.seek(0)
+
+        columns = ', '.join(INGEST_COLUMNS)
+        updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in INGEST_COLUMNS if column not in ('account', 'id'))
+
+        session.execute(text('CREATE TEMP TABLE IF NOT EXISTS emails_stage (LIKE emails INCLUDING DEFAULTS)'))
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f'COPY emails_stage ({columns}) FROM STDIN', buffer)
+        finally:
+            cursor.close()
+        session.execute(text(
+            f'INSERT INTO emails ({columns}, created_at, updated_at) SELECT {columns}, now(), now() FROM emails_stage '
+            f'ON CONFLICT (account, id) DO UPDATE SET {updates}, updated_at = now()'
+        ))
+        session.execute(text('TRUNCATE emails_stage'))
+        return len(emails_data)
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+def get_profile(database_url: str) -> EngineProfile:
+    backend = make_url(database_url).get_backend_name()
+    if backend == 'sqlite':
+        return SqliteProfile()
+    if backend == 'postgresql':
+        return PostgresProfile()
+    return EngineProfile()
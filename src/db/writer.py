@@ -0,0 +1,83 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+_STOP = object()
+
+
+# Serialises database writes (email ingest, rule logs, state updates) through one
+# thread and one session, committing queued work in batches.
+class SingleWriter:
+    def __init__(self, session_factory, batch_size: int = 500):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, work: Callable[[Session], Any]) -> Future:
+        future = Future()
+        self._queue.put((work, future))
+        return future
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        session = self.session_factory()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    self._queue.task_done()
+                    return
+
+                batch = [item]
+                stop = False
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                self._write_batch(session, batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+                if stop:
+                    self._queue.task_done()
+                    return
+        finally:
+            session.close()
+
+    def _write_batch(self, session: Session, batch):
+        try:
+            results = [work(session) for work, _ in batch]
+            session.commit()
+        except Exception:
+            session.rollback()
+            # Retry one by one so a single bad item doesn't drop the rest of the batch.
+            for work, future in batch:
+                try:
+                    result = work(session)
+                    session.commit()
+                    future.set_result(result)
+                except Exception as e:
+                    session.rollback()
+                    print(f"Error writing to database: {e}")
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
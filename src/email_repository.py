@@ -1,15 +1,19 @@
-from db.models import Email
-from typing import List, Optional
+from db.models import Email, DEFAULT_ACCOUNT
+from email_snapshot import EmailSnapshot
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 
 class EmailRepository:
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, account: str = DEFAULT_ACCOUNT):
         self.db_session = db_session
+        self.account = account
 
     def save_email(self, email_data: dict) -> Email:
-        existing_email = self.db_session.query(Email).filter_by(id=email_data['id']).first()
+        email_data = dict(email_data, account=self.account)
+        existing_email = self._query().filter_by(id=email_data['id']).first()
 
         if existing_email:
             for key, value in email_data.items():
@@ -32,20 +36,39 @@ class EmailRepository:
         return emails
 
     def get_email_by_id(self, email_id: str) -> Optional[Email]:
-        return self.db_session.query(Email).filter_by(id=email_id).first()
+        return self._query().filter_by(id=email_id).first()
 
     def get_all_emails(self) -> List[Email]:
-        return self.db_session.query(Email).all()
+        return self._query().all()
 
     def get_unread_emails(self) -> List[Email]:
-        return self.db_session.query(Email).filter_by(is_read=False).all()
+        return self._query().filter_by(is_read=False).all()
 
     def get_emails_by_sender(self, sender: str) -> List[Email]:
-        return self.db_session.query(Email).filter(
+        return self._query().filter(
             Email.from_address.ilike(f'%{sender}%')
         ).all()
 
     def get_emails_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Email]:
-        return self.db_session.query(Email).filter(
+        return self._query().filter(
             Email.date_received.between(start_date, end_date)
-        ).all()
\ No newline at end of file
+        ).all()
+
+    def get_email_snapshots(self) -> List[EmailSnapshot]:
+        return [EmailSnapshot.from_row(row) for row in self.db_session.execute(self._snapshot_select())]
+
+    def get_email_snapshot(self, email_id: str) -> Optional[EmailSnapshot]:
+        row = self.db_session.execute(self._snapshot_select().where(Email.id == email_id)).first()
+        return EmailSnapshot.from_row(row) if row else None
+
+    def iter_email_rows(self, batch_size: int = 1000) -> Iterator[Tuple]:
+        stmt = self._snapshot_select().execution_options(yield_per=batch_size)
+        yield from self.db_session.execute(stmt)
+
+    def _query(self):
+        return self.db_session.query(Email).filter_by(account=self.account)
+
+    def _snapshot_select(self):
+        return select(*[getattr(Email, column) for column in EmailSnapshot.COLUMNS]).where(
+            Email.account == self.account
+        )
\ No newline at end of file
@@ -0,0 +1,78 @@
+import json
+import mmap
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Sequence
+
+
+# Lightweight record used for rule evaluation. String fields are lowercased
+# once here so predicates don't re-normalise them for every condition.
+class EmailSnapshot:
+    __slots__ = (
+        'id',
+        'from_address',
+        'to_addresses',
+        'subject',
+        'message_body',
+        'snippet',
+        'date_received',
+        'is_read',
+    )
+
+    COLUMNS = __slots__
+
+    def __init__(self, id: str, from_address: Optional[str] = None, to_addresses: Optional[str] = None,
+                 subject: Optional[str] = None, message_body: Optional[str] = None,
+                 snippet: Optional[str] = None, date_received: Optional[datetime] = None,
+                 is_read: bool = False):
+        self.id = id
+        self.from_address = _lower(from_address)
+        self.to_addresses = _lower(to_addresses)
+        self.subject = _lower(subject)
+        self.message_body = _lower(message_body)
+        self.snippet = _lower(snippet)
+        self.date_received = date_received
+        self.is_read = is_read
+
+    @classmethod
+    def from_row(cls, row) -> 'EmailSnapshot':
+        return cls(*row)
+
+    def __repr__(self):
+        return f"<EmailSnapshot(id={self.id}, from={self.from_address})>"
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return str(value).lower()
+
+
+# Snapshot files are JSONL: a header line naming the columns, then one compact
+# JSON array per email in that column order.
+def write_snapshot_file(rows: Iterable[Sequence], path: str) -> int:
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'columns': list(EmailSnapshot.COLUMNS)}) + '\n')
+        for row in rows:
+            f.write(json.dumps(list(row), separators=(',', ':'), default=_encode_value) + '\n')
+            count += 1
+    return count
+
+
+def read_snapshot_file(path: str) -> Iterator[EmailSnapshot]:
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header = json.loads(mapped.readline())
+            columns = header['columns']
+
+            for line in iter(mapped.readline, b''):
+                values = dict(zip(columns, json.loads(line)))
+                if values.get('date_received'):
+                    values['date_received'] = datetime.fromisoformat(values['date_received'])
+                yield EmailSnapshot(**{column: values.get(column) for column in EmailSnapshot.COLUMNS})
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
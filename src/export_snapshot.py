@@ -0,0 +1,41 @@
+import sys
+from dotenv import load_dotenv
+load_dotenv('../.env')
+import argparse
+import os
+from db.database import DatabaseManager
+from db.models import DEFAULT_ACCOUNT
+from email_repository import EmailRepository
+from email_snapshot import write_snapshot_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the emails table to a snapshot file for offline rule replay')
+    parser.add_argument('--output', type=str, default='emails_snapshot.jsonl', help='Path of the snapshot file to write')
+    parser.add_argument('--account', type=str, default=os.getenv('GMAIL_ACCOUNT', DEFAULT_ACCOUNT),
+                        help='Account key the emails are stored under')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows fetched from the database per batch')
+
+    args = parser.parse_args()
+
+    try:
+        print("Initializing database connection...")
+        db_manager = DatabaseManager()
+        session = db_manager.get_session()
+        email_repo = EmailRepository(session, args.account)
+
+        print(f"Exporting emails to {args.output}...")
+        count = write_snapshot_file(email_repo.iter_email_rows(args.batch_size), args.output)
+
+        print(f"Exported {count} emails!")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if 'db_manager' in locals():
+            db_manager.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
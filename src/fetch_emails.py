@@ -2,7 +2,9 @@ import sys
 from dotenv import load_dotenv
 load_dotenv('../.env')
 import argparse
+import os
 from db.database import DatabaseManager
+from db.models import DEFAULT_ACCOUNT
 from gmail_client import GmailClient
 from email_repository import EmailRepository
 
@@ -11,6 +13,8 @@ def main():
     parser = argparse.ArgumentParser(description='Fetch emails from Gmail and store in database')
     parser.add_argument('--max-results', type=int, default=100, help='Maximum number of emails to fetch')
     parser.add_argument('--query', type=str, default='', help='Gmail search query')
+    parser.add_argument('--account', type=str, default=os.getenv('GMAIL_ACCOUNT', DEFAULT_ACCOUNT),
+                        help='Account key the emails are stored under')
     parser.add_argument('--create-tables', action='store_true', help='Create database tables if they don\'t exist')
 
     args = parser.parse_args()
@@ -25,7 +29,7 @@ def main():
             print("Tables created successfully!")
 
         session = db_manager.get_session()
-        email_repo = EmailRepository(session)
+        email_repo = EmailRepository(session, args.account)
 
         print("Authenticating with Gmail API...")
         gmail_client = GmailClient()
@@ -34,9 +38,9 @@ def main():
         emails_data = gmail_client.fetch_emails(max_results=args.max_results, query=args.query)
 
         print(f"Found {len(emails_data)} emails. Saving to database...")
-        saved_emails = email_repo.save_emails_batch(emails_data)
+        saved_count = db_manager.ingest_emails(emails_data, args.account).result()
 
-        print(f"Successfully saved {len(saved_emails)} emails to database!")
+        print(f"Successfully saved {saved_count} emails to database!")
 
         print("\nEmail Statistics:")
         print(f"  Total emails in DB: {len(email_repo.get_all_emails())}")
@@ -47,7 +51,7 @@ def main():
         sys.exit(1)
     finally:
         if 'db_manager' in locals():
-            db_manager.close_session()
+            db_manager.close()
 
 
 if __name__ == '__main__':
@@ -5,10 +5,12 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-import base64
 from email.utils import parsedate_to_datetime
 from datetime import datetime
 
+from mime_body import MessageBodyExtractor, DEFAULT_MAX_BODY_BYTES
+from quota import QuotaBudget, QuotaExceededError
+
 
 
 SCOPES = [
@@ -18,10 +20,17 @@ SCOPES = [
 
 
 class GmailClient:
-    def __init__(self, credentials_path=None, token_path=None):
+    def __init__(self, credentials_path=None, token_path=None, max_body_bytes=None, quota_budget=None,
+                 interactive=True):
         self.credentials_path = credentials_path or os.getenv('GMAIL_CREDENTIALS_PATH', 'credentials.json')
         self.token_path = token_path or os.getenv('GMAIL_TOKEN_PATH', 'credentials.json')
+        self.body_extractor = MessageBodyExtractor(
+            max_body_bytes or int(os.getenv('GMAIL_MAX_BODY_BYTES', DEFAULT_MAX_BODY_BYTES))
+        )
+        self.quota_budget = quota_budget or QuotaBudget()
+        self.interactive = interactive
         self.service = None
+        self._label_ids = None
         self._authenticate()
 
     def _authenticate(self):
@@ -33,6 +42,11 @@ class GmailClient:
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
+            elif not self.interactive:
+                # Background workers have no browser to complete the OAuth flow in.
+                raise RuntimeError(
+                    f"No valid or refreshable token at {self.token_path}; authorise this account interactively first"
+                )
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(
                     self.credentials_path, SCOPES)
@@ -44,7 +58,9 @@ class GmailClient:
         self.service = build('gmail', 'v1', credentials=creds)
 
     def fetch_emails(self, max_results=100, query=''):
+        emails = []
         try:
+            self.quota_budget.consume('messages.list')
             results = self.service.users().messages().list(
                 userId='me',
                 maxResults=max_results,
@@ -52,13 +68,15 @@ class GmailClient:
             ).execute()
 
             messages = results.get('messages', [])
-            emails = []
 
             for message in messages:
                 email_data = self._get_email_details(message['id'])
                 if email_data:
                     emails.append(email_data)
 
+            return emails
+        except QuotaExceededError as error:
+            print(f'Stopping fetch: {error}')
             return emails
         except HttpError as error:
             print(f'An error occurred: {error}')
@@ -66,6 +84,7 @@ class GmailClient:
 
     def _get_email_details(self, message_id):
         try:
+            self.quota_budget.consume('messages.get')
             message = self.service.users().messages().get(
                 userId='me',
                 id=message_id,
@@ -74,6 +93,7 @@ class GmailClient:
 
             headers = message['payload'].get('headers', [])
             headers_dict = {header['name']: header['value'] for header in headers}
+            message_body, has_attachments = self._get_message_body(message['payload'])
 
             email_data = {
                 'id': message['id'],
@@ -88,7 +108,8 @@ class GmailClient:
                 'is_read': 'UNREAD' not in message.get('labelIds', []),
                 'is_starred': 'STARRED' in message.get('labelIds', []),
                 'raw_headers': headers_dict,
-                'message_body': self._get_message_body(message['payload']),
+                'message_body': message_body,
+                'has_attachments': has_attachments,
                 'date_received': self._parse_date(headers_dict.get('Date', ''))
             }
 
@@ -98,22 +119,7 @@ class GmailClient:
             return None
 
     def _get_message_body(self, payload):
-        body = ""
-
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                        break
-                elif part['mimeType'] == 'text/html' and not body:
-                    if 'data' in part['body']:
-                        body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-        else:
-            if 'body' in payload and 'data' in payload['body']:
-                body = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
-
-        return body
+        return self.body_extractor.extract(payload)
 
     def _parse_date(self, date_string):
         if not date_string:
@@ -126,55 +132,71 @@ class GmailClient:
 
     def mark_as_read(self, message_id):
         try:
+            self.quota_budget.consume('messages.modify')
             self.service.users().messages().modify(
                 userId='me',
                 id=message_id,
                 body={'removeLabelIds': ['UNREAD']}
             ).execute()
             return True
-        except HttpError as error:
+        except (HttpError, QuotaExceededError) as error:
             print(f'Error marking message as read: {error}')
             return False
 
     def mark_as_unread(self, message_id):
         try:
+            self.quota_budget.consume('messages.modify')
             self.service.users().messages().modify(
                 userId='me',
                 id=message_id,
                 body={'addLabelIds': ['UNREAD']}
             ).execute()
             return True
-        except HttpError as error:
+        except (HttpError, QuotaExceededError) as error:
             print(f'Error marking message as unread: {error}')
             return False
 
     def move_to_label(self, message_id, label_name):
-        try:
-            labels = self.service.users().labels().list(userId='me').execute()
-            label_id = None
-
-            for label in labels.get('labels', []):
-                if label['name'].lower() == label_name.lower():
-                    label_id = label['id']
-                    break
-
-            if not label_id:
-                return False
+        label_id = self.get_label_id(label_name)
+        if not label_id:
+            return False
+        return self.modify_labels(message_id, add_label_ids=[label_id])
+
+    def modify_labels(self, message_id, add_label_ids=None, remove_label_ids=None):
+        body = {}
+        if add_label_ids:
+            body['addLabelIds'] = list(add_label_ids)
+        if remove_label_ids:
+            body['removeLabelIds'] = list(remove_label_ids)
+        if not body:
+            return True
 
+        try:
+            self.quota_budget.consume('messages.modify')
             self.service.users().messages().modify(
                 userId='me',
                 id=message_id,
-                body={'addLabelIds': [label_id]}
+                body=body
             ).execute()
             return True
-        except HttpError as error:
-            print(f'Error moving message: {error}')
+        except (HttpError, QuotaExceededError) as error:
+            print(f'Error modifying labels: {error}')
             return False
 
+    def get_label_id(self, label_name):
+        if self._label_ids is None:
+            labels = self.get_labels()
+            if not labels:
+                return None
+            self._label_ids = {label['name'].lower(): label['id'] for label in labels}
+
+        return self._label_ids.get(label_name.lower())
+
     def get_labels(self):
         try:
+            self.quota_budget.consume('labels.list')
             results = self.service.users().labels().list(userId='me').execute()
             return results.get('labels', [])
-        except HttpError as error:
+        except (HttpError, QuotaExceededError) as error:
             print(f'Error getting labels: {error}')
             return []
\ No newline at end of file
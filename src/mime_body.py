@@ -0,0 +1,111 @@
+import base64
+from email.message import Message
+from html.parser import HTMLParser
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MAX_BODY_BYTES = 64 * 1024
+# HTML is decoded from a larger window than the body cap, since <head>/<style> markup is stripped away.
+HTML_WINDOW_FACTOR = 8
+
+
+class MessageBodyExtractor:
+    def __init__(self, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES):
+        self.max_body_bytes = max_body_bytes
+
+    def extract(self, payload: Dict) -> Tuple[str, bool]:
+        plain_part = None
+        html_part = None
+        has_attachments = False
+
+        # Walk the MIME tree iteratively so nested multiparts (e.g. multipart/alternative
+        # inside multipart/mixed) are found without recursion. Only metadata is read here.
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            children = part.get('parts')
+            if children:
+                stack.extend(reversed(children))
+                continue
+
+            body = part.get('body', {})
+            if part.get('filename') or body.get('attachmentId'):
+                has_attachments = True
+                continue
+
+            if 'data' not in body:
+                continue
+
+            mime_type = part.get('mimeType', '').lower()
+            if mime_type == 'text/html':
+                if html_part is None:
+                    html_part = part
+            elif plain_part is None and (mime_type == 'text/plain' or part is payload):
+                # A non-multipart payload is used as the body whatever its type, as before.
+                plain_part = part
+
+        if plain_part is not None:
+            return self._decode_part(plain_part, self.max_body_bytes), has_attachments
+        if html_part is not None:
+            text = html_to_text(self._decode_part(html_part, self.max_body_bytes * HTML_WINDOW_FACTOR))
+            return text.encode('utf-8')[:self.max_body_bytes].decode('utf-8', errors='ignore'), has_attachments
+        return "", has_attachments
+
+    def _decode_part(self, part: Dict, max_bytes: int) -> str:
+        data = part['body']['data']
+
+        # Only decode as much base64 as is needed to produce max_bytes.
+        max_chars = -(-max_bytes // 3) * 4
+        data = data[:max_chars]
+        data += '=' * (-len(data) % 4)
+        raw = base64.urlsafe_b64decode(data)[:max_bytes]
+
+        charset = _get_charset(part) or 'utf-8'
+        try:
+            return raw.decode(charset, errors='replace')
+        except LookupError:
+            return raw.decode('utf-8', errors='replace')
+
+
+def _get_charset(part: Dict) -> Optional[str]:
+    for header in part.get('headers', []):
+        if header.get('name', '').lower() == 'content-type':
+            message = Message()
+            message['Content-Type'] = header.get('value', '')
+            return message.get_content_charset()
+    return None
+
+
+class _HTMLTextExtractor(HTMLParser):
+    SKIP_TAGS = {'script', 'style', 'head', 'title'}
+    BLOCK_TAGS = {'br', 'p', 'div', 'tr', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'blockquote'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.chunks.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.chunks.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            # Newlines in HTML source are just whitespace; line breaks come from block tags.
+            self.chunks.append(' '.join(data.splitlines()))
+
+
+def html_to_text(html: str) -> str:
+    parser = _HTMLTextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    lines = (' '.join(line.split()) for line in ''.join(parser.chunks).splitlines())
+    return '\n'.join(line for line in lines if line)
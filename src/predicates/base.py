@@ -7,6 +7,15 @@ class Predicate(ABC):
     def evaluate(self, field_value: Any, rule_value: Any) -> bool:
         pass
 
+    def prepare(self, rule_value: Any) -> Any:
+        # Called once per rule condition; the result is passed back as rule_value for every email.
+        return rule_value
+
+    def evaluate_normalized(self, field_value: Any, rule_value: Any) -> bool:
+        # field_value comes from an EmailSnapshot, so string fields are already lowercased,
+        # and rule_value is the result of prepare().
+        return self.evaluate(field_value, rule_value)
+
     @abstractmethod
     def get_name(self) -> str:
         pass
\ No newline at end of file
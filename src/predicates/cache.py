@@ -0,0 +1,26 @@
+import re
+from functools import lru_cache
+from typing import Any, FrozenSet, Pattern, Tuple
+
+# Shared across all rules and emails; bounded so a large rules file can't grow it without limit.
+CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_pattern(pattern: str) -> Pattern:
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid regex '{pattern}': {e}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_value_set(values: Tuple[str, ...]) -> FrozenSet[str]:
+    return frozenset(value.strip().lower() for value in values if value.strip())
+
+
+def to_value_tuple(rule_value: Any) -> Tuple[str, ...]:
+    # Rule values may be a JSON list or a comma-separated string.
+    if isinstance(rule_value, (list, tuple, set, frozenset)):
+        return tuple(str(value) for value in rule_value)
+    return tuple(str(rule_value).split(','))
\ No newline at end of file
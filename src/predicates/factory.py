@@ -11,6 +11,11 @@ from predicates.date_predicates import (
     LessThanMonthsPredicate,
     GreaterThanMonthsPredicate
 )
+from predicates.pattern_predicates import (
+    MatchesRegexPredicate,
+    InListPredicate,
+    DomainInPredicate
+)
 from typing import Dict, Type
 
 
@@ -42,4 +47,7 @@ PredicateFactory.register(DoesNotEqualPredicate)
 PredicateFactory.register(LessThanDaysPredicate)
 PredicateFactory.register(GreaterThanDaysPredicate)
 PredicateFactory.register(LessThanMonthsPredicate)
-PredicateFactory.register(GreaterThanMonthsPredicate)
\ No newline at end of file
+PredicateFactory.register(GreaterThanMonthsPredicate)
+PredicateFactory.register(MatchesRegexPredicate)
+PredicateFactory.register(InListPredicate)
+PredicateFactory.register(DomainInPredicate)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from predicates.base import Predicate
+from predicates.cache import compile_pattern, compile_value_set, to_value_tuple
+from email.utils import getaddresses
+from typing import Any, FrozenSet, List, Pattern
+import re
+
+
+class MatchesRegexPredicate(Predicate):
+    def prepare(self, rule_value: Any) -> Pattern:
+        return compile_pattern(str(rule_value))
+
+    def evaluate(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return False
+        pattern = rule_value if isinstance(rule_value, re.Pattern) else self.prepare(rule_value)
+        return pattern.search(str(field_value)) is not None
+
+    def get_name(self) -> str:
+        return "matches_regex"
+
+
+class InListPredicate(Predicate):
+    def prepare(self, rule_value: Any) -> FrozenSet[str]:
+        return compile_value_set(to_value_tuple(rule_value))
+
+    def evaluate(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return False
+        return self.evaluate_normalized(str(field_value).lower(), rule_value)
+
+    def evaluate_normalized(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return False
+        values = rule_value if isinstance(rule_value, frozenset) else self.prepare(rule_value)
+        field_value = str(field_value)
+        if field_value.strip() in values:
+            return True
+        return any(address in values for address in _addresses(field_value))
+
+    def get_name(self) -> str:
+        return "in_list"
+
+
+class DomainInPredicate(Predicate):
+    def prepare(self, rule_value: Any) -> FrozenSet[str]:
+        return compile_value_set(tuple(value.strip().lstrip('@') for value in to_value_tuple(rule_value)))
+
+    def evaluate(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return False
+        return self.evaluate_normalized(str(field_value).lower(), rule_value)
+
+    def evaluate_normalized(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return False
+        domains = rule_value if isinstance(rule_value, frozenset) else self.prepare(rule_value)
+
+        for address in _addresses(str(field_value)):
+            domain = address.rpartition('@')[2]
+            # Also check parent domains so "example.com" matches "mail.example.com".
+            while domain:
+                if domain in domains:
+                    return True
+                domain = domain.partition('.')[2]
+        return False
+
+    def get_name(self) -> str:
+        return "domain_in"
+
+
+def _addresses(field_value: str) -> List[str]:
+    return [address.strip() for _, address in getaddresses([field_value]) if '@' in address]
\ No newline at end of file
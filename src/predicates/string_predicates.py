@@ -8,6 +8,17 @@ class ContainsPredicate(Predicate):
             return False
         return str(rule_value).lower() in str(field_value).lower()
 
+    def prepare(self, rule_value: Any) -> str:
+        return str(rule_value).lower()
+
+    def evaluate_normalized(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return False
+        if not isinstance(field_value, str):
+            # Non-text fields such as date_received keep the baseline str() comparison.
+            return self.evaluate(field_value, rule_value)
+        return rule_value in field_value
+
     def get_name(self) -> str:
         return "contains"
 
@@ -18,6 +29,16 @@ class DoesNotContainPredicate(Predicate):
             return True
         return str(rule_value).lower() not in str(field_value).lower()
 
+    def prepare(self, rule_value: Any) -> str:
+        return str(rule_value).lower()
+
+    def evaluate_normalized(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return True
+        if not isinstance(field_value, str):
+            return self.evaluate(field_value, rule_value)
+        return rule_value not in field_value
+
     def get_name(self) -> str:
         return "does_not_contain"
 
@@ -28,6 +49,16 @@ class EqualsPredicate(Predicate):
             return rule_value is None
         return str(field_value).lower() == str(rule_value).lower()
 
+    def prepare(self, rule_value: Any) -> Any:
+        return None if rule_value is None else str(rule_value).lower()
+
+    def evaluate_normalized(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return rule_value is None
+        if not isinstance(field_value, str):
+            return self.evaluate(field_value, rule_value)
+        return field_value == rule_value
+
     def get_name(self) -> str:
         return "equals"
 
@@ -38,5 +69,15 @@ class DoesNotEqualPredicate(Predicate):
             return rule_value is not None
         return str(field_value).lower() != str(rule_value).lower()
 
+    def prepare(self, rule_value: Any) -> Any:
+        return None if rule_value is None else str(rule_value).lower()
+
+    def evaluate_normalized(self, field_value: Any, rule_value: Any) -> bool:
+        if field_value is None:
+            return rule_value is not None
+        if not isinstance(field_value, str):
+            return self.evaluate(field_value, rule_value)
+        return field_value != rule_value
+
     def get_name(self) -> str:
         return "does_not_equal"
\ No newline at end of file
@@ -1,11 +1,12 @@
 import sys
 from dotenv import load_dotenv
 
-from db.models import Email
-
 load_dotenv('../.env')
 import argparse
+import os
+from condition_optimizer import ConditionOptimizer
 from db.database import DatabaseManager
+from db.models import DEFAULT_ACCOUNT
 from gmail_client import GmailClient
 from rule_engine import RuleEngine
 from email_repository import EmailRepository
@@ -15,7 +16,14 @@ from email_repository import EmailRepository
 def main():
     parser = argparse.ArgumentParser(description='Process emails based on rules')
     parser.add_argument('--rules-file', type=str, default='rules.json', help='Path to rules JSON file')
+    parser.add_argument('--account', type=str, default=os.getenv('GMAIL_ACCOUNT', DEFAULT_ACCOUNT),
+                        help='Account key the emails are stored under')
     parser.add_argument('--email-id', type=str, help='Process specific email by ID')
+    parser.add_argument('--merge-actions', action='store_true',
+                        help='Evaluate all rules per email first and apply their actions as one label change')
+    parser.add_argument('--stats-file', type=str, default=os.getenv('CONDITION_STATS_PATH', 'condition_stats.json'),
+                        help='Where condition selectivity stats are persisted between runs')
+    parser.add_argument('--show-plans', action='store_true', help='Print the condition evaluation order chosen per rule')
     parser.add_argument('--dry-run', action='store_true', help='Dry run - don\'t actually execute actions')
 
     args = parser.parse_args()
@@ -29,23 +37,26 @@ def main():
         gmail_client = GmailClient()
 
         print(f"Loading rules from {args.rules_file}...")
-        rule_engine = RuleEngine(gmail_client, session)
+        optimizer = ConditionOptimizer(args.stats_file)
+        rule_engine = RuleEngine(gmail_client, session, merge_actions=args.merge_actions,
+                                 optimizer=optimizer, dry_run=args.dry_run,
+                                 writer=db_manager.get_writer(), account=args.account)
         rules = rule_engine.load_rules_from_file(args.rules_file)
 
         print(f"Loaded {len(rules)} rules:")
         for i, rule in enumerate(rules, 1):
             print(f"  {i}. {rule.get('name', 'Unnamed')}: {rule.get('description', 'No description')}")
 
+        email_repo = EmailRepository(session, args.account)
         if args.email_id:
-            email_repo = EmailRepository(session)
-            email = email_repo.get_email_by_id(args.email_id)
+            email = email_repo.get_email_snapshot(args.email_id)
             if not email:
                 print(f"Email with ID {args.email_id} not found!")
                 sys.exit(1)
             emails = [email]
             print(f"\nProcessing single email: {email.id}")
         else:
-            emails = session.query(Email).all()
+            emails = email_repo.get_email_snapshots()
             print(f"\nProcessing all emails in database...")
 
         if args.dry_run:
@@ -56,6 +67,16 @@ def main():
 
         print("\nRule processing completed!")
 
+        if args.show_plans:
+            print("\nCondition plans:")
+            for plan in rule_engine.get_condition_plans(rules):
+                print(f"  {plan['rule']} ({plan['predicate']}):")
+                for condition in plan['conditions']:
+                    print(f"    {condition['position']}. {condition['field']} {condition['predicate']} "
+                          f"{condition['value']!r} cost={condition['static_cost']} "
+                          f"selectivity={condition['selectivity']} "
+                          f"({condition['matches']}/{condition['evaluations']})")
+
     except FileNotFoundError:
         print(f"Error: Rules file '{args.rules_file}' not found!", file=sys.stderr)
         sys.exit(1)
@@ -66,7 +87,7 @@ def main():
         sys.exit(1)
     finally:
         if 'db_manager' in locals():
-            db_manager.close_session()
+            db_manager.close()
 
 
 if __name__ == '__main__':
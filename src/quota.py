@@ -0,0 +1,25 @@
+from typing import Optional
+
+# Gmail API quota units per call (https://developers.google.com/gmail/api/reference/quota).
+QUOTA_COSTS = {
+    'messages.list': 5,
+    'messages.get': 5,
+    'messages.modify': 5,
+    'labels.list': 1,
+}
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class QuotaBudget:
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.used = 0
+
+    def consume(self, method: str):
+        cost = QUOTA_COSTS.get(method, 1)
+        if self.limit is not None and self.used + cost > self.limit:
+            raise QuotaExceededError(f"Quota budget of {self.limit} units exhausted before {method}")
+        self.used += cost
\ No newline at end of file
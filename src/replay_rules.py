@@ -0,0 +1,44 @@
+import sys
+import argparse
+import time
+from condition_optimizer import ConditionOptimizer
+from email_snapshot import read_snapshot_file
+from rule_engine import RuleEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate a rules file against an exported snapshot, offline')
+    parser.add_argument('--snapshot', type=str, default='emails_snapshot.jsonl', help='Snapshot file written by export_snapshot.py')
+    parser.add_argument('--rules-file', type=str, default='rules.json', help='Path to rules JSON file')
+    parser.add_argument('--stats-file', type=str, help='Optional condition stats file used to order conditions')
+
+    args = parser.parse_args()
+
+    try:
+        # No Gmail client and no database session: replay only evaluates conditions.
+        rule_engine = RuleEngine(None, None, optimizer=ConditionOptimizer(args.stats_file))
+        rules = rule_engine.load_rules_from_file(args.rules_file)
+        if rules is None:
+            sys.exit(1)
+
+        print(f"Replaying {len(rules)} rules against {args.snapshot}...")
+        started = time.perf_counter()
+        report = rule_engine.replay_rules(rules, read_snapshot_file(args.snapshot))
+        elapsed = time.perf_counter() - started
+
+        total = report[0]['emails'] if report else 0
+        print(f"\nEvaluated {total} emails in {elapsed:.2f}s\n")
+        print(f"  {'Rule':<40} {'Matches':>10} {'Errors':>8} {'Time (s)':>10}")
+        for entry in report:
+            print(f"  {entry['rule'][:40]:<40} {entry['matches']:>10} {entry['errors']:>8} {entry['seconds']:>10.3f}")
+
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
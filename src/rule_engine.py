@@ -1,17 +1,32 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Tuple, Union
 from predicates.factory import PredicateFactory
 from actions.factory import ActionFactory
-from db.models import Email, RuleExecutionLog
+from actions.plan import LabelChangePlan
+from condition_optimizer import CompiledCondition, ConditionOptimizer
+from db.models import Email, RuleExecutionLog, DEFAULT_ACCOUNT
+from db.writer import SingleWriter
+from email_repository import EmailRepository
+from email_snapshot import EmailSnapshot
 from datetime import datetime
 import json
+import time
 from pathlib import Path
 
 
 
 class RuleEngine:
-    def __init__(self, gmail_client, db_session):
+    def __init__(self, gmail_client, db_session, merge_actions: bool = False,
+                 optimizer: ConditionOptimizer = None, dry_run: bool = False, writer: SingleWriter = None,
+                 account: str = DEFAULT_ACCOUNT):
         self.gmail_client = gmail_client
         self.db_session = db_session
+        self.merge_actions = merge_actions
+        self.dry_run = dry_run
+        self.writer = writer
+        self.account = account
+        self.rule_matches: Dict[str, int] = {}
+        self.optimizer = optimizer or ConditionOptimizer()
+        self._compiled_conditions: Dict[Tuple[int, str], Tuple[List[Dict], List[CompiledCondition]]] = {}
         self.field_mapping = {
             'from': 'from_address',
             'to': 'to_addresses',
@@ -30,15 +45,47 @@ class RuleEngine:
         except Exception as e:
             print("Error loading file", e)
 
-    def process_rules(self, rules: List[Dict], emails: List[Email] = None):
+    def process_rules(self, rules: List[Dict], emails: List[Union[Email, EmailSnapshot]] = None):
         if emails is None:
-            emails = self.db_session.query(Email).all()
+            emails = EmailRepository(self.db_session, self.account).get_email_snapshots()
+
+        # Re-plan condition order from the latest stats at the start of every run.
+        self._compiled_conditions.clear()
 
         for email in emails:
+            if self.merge_actions:
+                self._process_email_merged(rules, email)
+                continue
+
             for rule in rules:
                 self._process_single_rule(rule, email)
 
-    def _process_single_rule(self, rule: Dict, email: Email):
+        self.optimizer.save()
+
+    def replay_rules(self, rules: List[Dict], emails: Iterable[EmailSnapshot]) -> List[Dict]:
+        # Evaluation only: no actions, no state updates and no execution logs.
+        self._compiled_conditions.clear()
+        report = [{'rule': rule.get('name', 'Unnamed Rule'), 'matches': 0, 'errors': 0, 'seconds': 0.0}
+                  for rule in rules]
+        total = 0
+
+        for email in emails:
+            total += 1
+            for rule, entry in zip(rules, report):
+                started = time.perf_counter()
+                try:
+                    if self._evaluate_conditions(rule.get('conditions', []),
+                                                 rule.get('predicate', 'all').lower(), email):
+                        entry['matches'] += 1
+                except Exception:
+                    entry['errors'] += 1
+                entry['seconds'] += time.perf_counter() - started
+
+        for entry in report:
+            entry['emails'] = total
+        return report
+
+    def _process_single_rule(self, rule: Dict, email: Union[Email, EmailSnapshot]):
         rule_name = rule.get('name', 'Unnamed Rule')
         conditions = rule.get('conditions', [])
         predicate_type = rule.get('predicate', 'all').lower()
@@ -46,13 +93,14 @@ class RuleEngine:
 
         try:
             if self._evaluate_conditions(conditions, predicate_type, email):
+                self.rule_matches[rule_name] = self.rule_matches.get(rule_name, 0) + 1
                 action_results = self._execute_actions(actions, email.id)
                 self._log_execution(
                     email.id,
                     rule_name,
                     conditions,
                     action_results,
-                    'success'
+                    'dry_run' if self.dry_run else 'success'
                 )
 
         except Exception as e:
@@ -65,14 +113,111 @@ class RuleEngine:
                 str(e)
             )
 
-    def _evaluate_conditions(self, conditions: List[Dict], predicate_type: str, email: Email) -> bool:
-        if not conditions:
+    def _process_email_merged(self, rules: List[Dict], email: Union[Email, EmailSnapshot]):
+        # Plan-then-apply: evaluate every rule first, fold their actions into one
+        # LabelChangePlan and send a single modify call for the email.
+        label_plan = LabelChangePlan(current_is_read=email.is_read)
+        matched_rules = []
+
+        for rule in rules:
+            rule_name = rule.get('name', 'Unnamed Rule')
+            conditions = rule.get('conditions', [])
+            predicate_type = rule.get('predicate', 'all').lower()
+            actions = rule.get('actions', [])
+
+            try:
+                if self._evaluate_conditions(conditions, predicate_type, email):
+                    self.rule_matches[rule_name] = self.rule_matches.get(rule_name, 0) + 1
+                    action_results = self._plan_actions(actions, email.id, label_plan)
+                    matched_rules.append((rule_name, conditions, action_results))
+            except Exception as e:
+                self._log_execution(email.id, rule_name, conditions, [], 'error', str(e))
+
+        if not matched_rules:
+            return
+
+        plan_result = None
+        if not label_plan.is_empty() and not self.dry_run:
+            try:
+                plan_result = label_plan.apply(email.id, self.gmail_client)
+            except Exception as e:
+                plan_result = {'success': False, 'email_id': email.id, 'error': str(e)}
+
+            # Only mirror the change locally once Gmail has actually accepted it.
+            if plan_result.get('modified'):
+                self._apply_plan_state(email.id, label_plan)
+
+        missing_labels = set()
+        modify_error = None
+        if plan_result is not None:
+            missing_labels = {label.lower() for label in plan_result.get('missing_labels', [])}
+            if not plan_result.get('modified'):
+                modify_error = plan_result.get('error') or 'Failed to apply merged label change'
+
+        net_change = label_plan.to_dict()
+        for rule_name, conditions, action_results in matched_rules:
+            errors = []
+            for result in action_results:
+                if not result.get('merged'):
+                    continue
+
+                result['net_change'] = net_change
+                error = modify_error
+                label = result['params'].get('label', 'INBOX') if result['action'] == 'move_message' else None
+                if error is None and label is not None and label.lower() in missing_labels:
+                    error = f"Label not found: {label}"
+
+                result['success'] = error is None
+                if error is not None:
+                    result['error'] = error
+                    errors.append(error)
+
+            if self.dry_run:
+                status = 'dry_run'
+            elif errors:
+                status = 'error'
+            else:
+                status = 'success'
+            self._log_execution(email.id, rule_name, conditions, action_results, status,
+                                '; '.join(errors) if errors else None)
+
+    def _evaluate_conditions(self, conditions: List[Dict], predicate_type: str,
+                             email: Union[Email, EmailSnapshot]) -> bool:
+        if not conditions or predicate_type not in ('all', 'any'):
             return False
 
-        results = []
+        normalized = isinstance(email, EmailSnapshot)
+        evaluated = False
 
-        for condition in conditions:
+        for condition in self._compile_conditions(conditions, predicate_type):
+            evaluated = True
+            if condition.predicate is None:
+                result = False
+            else:
+                field_value = getattr(email, condition.field, None)
+                if normalized:
+                    result = condition.predicate.evaluate_normalized(field_value, condition.value)
+                else:
+                    result = condition.predicate.evaluate(field_value, condition.value)
+            self.optimizer.record(condition, result)
+
+            if predicate_type == 'all' and not result:
+                return False
+            if predicate_type == 'any' and result:
+                return True
+
+        return evaluated and predicate_type == 'all'
 
+    def _compile_conditions(self, conditions: List[Dict], predicate_type: str) -> List[CompiledCondition]:
+        # Predicates and their prepared values (compiled regexes, value sets) are built
+        # once per rule, ordered by the optimizer and reused for every email.
+        cache_key = (id(conditions), predicate_type)
+        cached = self._compiled_conditions.get(cache_key)
+        if cached and cached[0] is conditions:
+            return cached[1]
+
+        compiled = []
+        for condition in conditions:
             field_name = condition.get('field', '').lower()
             predicate_name = condition.get('predicate', '')
             value = condition.get('value', '')
@@ -81,22 +226,30 @@ class RuleEngine:
             if not db_field_name:
                 continue
 
-            field_value = getattr(email, db_field_name, None)
-
             try:
                 predicate = PredicateFactory.get_predicate(predicate_name)
-                result = predicate.evaluate(field_value, value)
-                results.append(result)
+                prepared_value = predicate.prepare(value)
             except ValueError as e:
                 print(f"Error evaluating predicate {predicate_name}: {e}")
-                results.append(False)
+                predicate, prepared_value = None, value
 
-        if predicate_type == 'all':
-            return all(results) if results else False
-        elif predicate_type == 'any':
-            return any(results) if results else False
-        else:
-            return False
+            compiled.append(self.optimizer.compile(db_field_name, predicate_name, predicate, value, prepared_value))
+
+        compiled = self.optimizer.order(compiled, predicate_type)
+        self._compiled_conditions[cache_key] = (conditions, compiled)
+        return compiled
+
+    def get_condition_plans(self, rules: List[Dict]) -> List[Dict]:
+        plans = []
+        for rule in rules:
+            predicate_type = rule.get('predicate', 'all').lower()
+            compiled = self._compile_conditions(rule.get('conditions', []), predicate_type)
+            plans.append({
+                'rule': rule.get('name', 'Unnamed Rule'),
+                'predicate': predicate_type,
+                'conditions': self.optimizer.describe(compiled)
+            })
+        return plans
 
     def _execute_actions(self, actions: List[Dict], email_id: str) -> List[Dict]:
         results = []
@@ -107,6 +260,10 @@ class RuleEngine:
 
             try:
                 action = ActionFactory.get_action(action_name)
+                if self.dry_run:
+                    results.append(self._dry_run_result(action_name, email_id, action_params))
+                    continue
+
                 result = action.execute(email_id, self.gmail_client, **action_params)
                 results.append(result)
                 self._update_email_state(email_id, action_name, action_params)
@@ -121,22 +278,80 @@ class RuleEngine:
 
         return results
 
-    def _update_email_state(self, email_id: str, action_name: str, params: Dict):
-        email = self.db_session.query(Email).filter_by(id=email_id).first()
-        if not email:
+    def _plan_actions(self, actions: List[Dict], email_id: str, label_plan: LabelChangePlan) -> List[Dict]:
+        results = []
+
+        for action_config in actions:
+            action_name = action_config.get('action', '')
+            action_params = action_config.get('params', {})
+
+            try:
+                action = ActionFactory.get_action(action_name)
+                if action.plan(label_plan, **action_params):
+                    results.append({
+                        'action': action_name,
+                        'email_id': email_id,
+                        'params': action_params,
+                        'merged': True
+                    })
+                elif self.dry_run:
+                    results.append(self._dry_run_result(action_name, email_id, action_params))
+                else:
+                    result = action.execute(email_id, self.gmail_client, **action_params)
+                    results.append(result)
+                    self._update_email_state(email_id, action_name, action_params)
+
+            except ValueError as e:
+                print(f"Error executing action {action_name}: {e}")
+                results.append({
+                    'action': action_name,
+                    'success': False,
+                    'error': str(e)
+                })
+
+        return results
+
+    def _dry_run_result(self, action_name: str, email_id: str, params: Dict) -> Dict:
+        return {
+            'action': action_name,
+            'success': True,
+            'email_id': email_id,
+            'params': params,
+            'dry_run': True
+        }
+
+    def _apply_plan_state(self, email_id: str, label_plan: LabelChangePlan):
+        if not label_plan.changes_read_state():
             return
 
+        self._write_email_state(email_id, {'is_read': label_plan.read_state, 'updated_at': datetime.now()})
+
+    def _update_email_state(self, email_id: str, action_name: str, params: Dict):
+        values = {'updated_at': datetime.now()}
         if action_name == 'mark_as_read':
-            email.is_read = True
+            values['is_read'] = True
         elif action_name == 'mark_as_unread':
-            email.is_read = False
+            values['is_read'] = False
 
-        email.updated_at = datetime.now()
+        self._write_email_state(email_id, values)
+
+    def _write_email_state(self, email_id: str, values: Dict):
+        if self.writer is not None:
+            self.writer.submit(lambda session: session.query(Email).filter_by(account=self.account, id=email_id).update(values))
+            return
+
+        email = self.db_session.query(Email).filter_by(account=self.account, id=email_id).first()
+        if not email:
+            return
+
+        for key, value in values.items():
+            setattr(email, key, value)
         self.db_session.commit()
 
     def _log_execution(self, email_id: str, rule_name: str, conditions: List[Dict],
                        actions: List[Dict], status: str, error_message: str = None):
         log = RuleExecutionLog(
+            account=self.account,
             email_id=email_id,
             rule_name=rule_name,
             rule_conditions=conditions,
@@ -144,5 +359,9 @@ class RuleEngine:
             execution_status=status,
             error_message=error_message
         )
+        if self.writer is not None:
+            self.writer.submit(lambda session: session.add(log))
+            return
+
         self.db_session.add(log)
         self.db_session.commit()
\ No newline at end of file
@@ -0,0 +1,193 @@
+import sys
+from dotenv import load_dotenv
+load_dotenv('../.env')
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+from condition_optimizer import ConditionOptimizer
+from db.database import DatabaseManager
+from gmail_client import GmailClient
+from quota import QuotaBudget
+from rule_engine import RuleEngine
+
+
+# Runs in a worker process: every account gets its own engine, Gmail client and quota budget.
+# Each worker also has its own SingleWriter, so writes are only serialised within a process.
+# Across workers, SQLite relies on WAL plus busy_timeout to queue writers on the database lock;
+# PostgreSQL handles concurrent writers natively and is the recommended backend for many workers.
+def process_account(account_config: Dict, options: Dict) -> Dict:
+    account = account_config['account']
+    summary = {
+        'account': account,
+        'fetched': 0,
+        'saved': 0,
+        'rule_matches': {},
+        'quota_used': 0,
+        'seconds': 0.0,
+        'error': None
+    }
+    started = time.perf_counter()
+    db_manager = None
+    quota_budget = QuotaBudget(account_config.get('quota_units', options.get('quota_units')))
+
+    try:
+        db_manager = DatabaseManager(options.get('database_url'))
+        session = db_manager.get_session()
+
+        gmail_client = GmailClient(
+            credentials_path=account_config.get('credentials_path'),
+            token_path=account_config.get('token_path'),
+            quota_budget=quota_budget,
+            interactive=False
+        )
+
+        if not options.get('skip_fetch'):
+            emails_data = gmail_client.fetch_emails(
+                max_results=account_config.get('max_results', options.get('max_results', 100)),
+                query=account_config.get('query', '')
+            )
+            summary['fetched'] = len(emails_data)
+            summary['saved'] = db_manager.ingest_emails(emails_data, account).result()
+
+        rule_engine = RuleEngine(
+            gmail_client,
+            session,
+            merge_actions=options.get('merge_actions', False),
+            optimizer=ConditionOptimizer(account_config.get('stats_file', f'condition_stats_{account}.json')),
+            dry_run=options.get('dry_run', False),
+            writer=db_manager.get_writer(),
+            account=account
+        )
+        rules = rule_engine.load_rules_from_file(account_config.get('rules_file', 'rules.json'))
+        if rules is None:
+            raise ValueError(f"Could not load rules file {account_config.get('rules_file', 'rules.json')}")
+
+        rule_engine.process_rules(rules)
+        db_manager.get_writer().flush()
+        summary['rule_matches'] = rule_engine.rule_matches
+
+    except Exception as e:
+        summary['error'] = str(e)
+    finally:
+        if db_manager is not None:
+            db_manager.close()
+        summary['quota_used'] = quota_budget.used
+        summary['seconds'] = round(time.perf_counter() - started, 3)
+
+    return summary
+
+
+def load_accounts(accounts_file: str) -> List[Dict]:
+    path = Path(accounts_file)
+    if not path.is_absolute():
+        path = Path(__file__).parent / path
+
+    with open(path, 'r') as f:
+        accounts = json.load(f)
+
+    keys = [account.get('account') for account in accounts]
+    if not all(keys) or len(set(keys)) != len(keys):
+        raise ValueError("Every account needs a unique 'account' key")
+
+    # Without its own token an account would fall back to GMAIL_TOKEN_PATH and silently
+    # process another account's mailbox.
+    token_paths = {}
+    for account in accounts:
+        token_path = account.get('token_path')
+        if not token_path:
+            raise ValueError(f"Account '{account['account']}' needs a 'token_path'")
+
+        resolved = os.path.abspath(token_path)
+        if resolved in token_paths:
+            raise ValueError(f"Accounts '{token_paths[resolved]}' and '{account['account']}' share token_path {token_path}")
+        token_paths[resolved] = account['account']
+
+    return accounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch and process rules for many Gmail accounts in parallel')
+    parser.add_argument('--accounts-file', type=str, default='accounts.json', help='Path to accounts JSON file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--max-results', type=int, default=100, help='Default maximum emails to fetch per account')
+    parser.add_argument('--quota-units', type=int, help='Default Gmail API quota budget per account')
+    parser.add_argument('--skip-fetch', action='store_true', help='Only process rules on emails already in the database')
+    parser.add_argument('--merge-actions', action='store_true', help='Apply each email\'s actions as one label change')
+    parser.add_argument('--dry-run', action='store_true', help='Dry run - don\'t actually execute actions')
+    parser.add_argument('--report-file', type=str, help='Write the aggregated report as JSON to this path')
+
+    args = parser.parse_args()
+
+    try:
+        accounts = load_accounts(args.accounts_file)
+        print(f"Loaded {len(accounts)} accounts from {args.accounts_file}")
+
+        # Create tables once up front so workers don't race on schema creation.
+        db_manager = DatabaseManager()
+        db_manager.close()
+        db_manager.engine.dispose()
+
+        workers = max(1, min(args.workers or 1, len(accounts)))
+        if db_manager.profile.name == 'sqlite' and workers > 1:
+            print(f"Note: {workers} workers will take turns on the SQLite write lock; "
+                  f"use PostgreSQL for heavily overlapping runs.")
+
+        options = {
+            'database_url': db_manager.database_url,
+            'max_results': args.max_results,
+            'quota_units': args.quota_units,
+            'skip_fetch': args.skip_fetch,
+            'merge_actions': args.merge_actions,
+            'dry_run': args.dry_run
+        }
+
+        started = time.perf_counter()
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process_account, account, options) for account in accounts]
+            for future in as_completed(futures):
+                summary = future.result()
+                status = f"error: {summary['error']}" if summary['error'] else 'ok'
+                print(f"  [{summary['account']}] fetched={summary['fetched']} "
+                      f"matches={sum(summary['rule_matches'].values())} "
+                      f"quota={summary['quota_used']} {summary['seconds']}s {status}")
+                results.append(summary)
+
+        report = {
+            'accounts': sorted(results, key=lambda summary: summary['account']),
+            'total_fetched': sum(summary['fetched'] for summary in results),
+            'total_matches': sum(sum(summary['rule_matches'].values()) for summary in results),
+            'total_quota_used': sum(summary['quota_used'] for summary in results),
+            'failed_accounts': [summary['account'] for summary in results if summary['error']],
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+        print("\nSummary:")
+        print(f"  Accounts: {len(results)} ({len(report['failed_accounts'])} failed)")
+        print(f"  Emails fetched: {report['total_fetched']}")
+        print(f"  Rule matches: {report['total_matches']}")
+        print(f"  Quota used: {report['total_quota_used']} units")
+        print(f"  Wall time: {report['seconds']}s")
+
+        if args.report_file:
+            with open(args.report_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to {args.report_file}")
+
+        if report['failed_accounts']:
+            sys.exit(1)
+
+    except FileNotFoundError:
+        print(f"Error: Accounts file '{args.accounts_file}' not found!", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+
+from condition_optimizer import ConditionOptimizer
+from predicates.string_predicates import ContainsPredicate
+
+
+def compile_condition(optimizer, field, predicate_name='contains', value='x', predicate=ContainsPredicate()):
+    return optimizer.compile(field, predicate_name, predicate, value, value)
+
+
+def set_stats(optimizer, condition, evaluations, matches):
+    optimizer.stats[condition.key].evaluations = evaluations
+    optimizer.stats[condition.key].matches = matches
+
+
+def fields(compiled):
+    return [condition.field for condition in compiled]
+
+
+def test_unseen_conditions_are_ordered_by_static_cost():
+    optimizer = ConditionOptimizer()
+    compiled = [compile_condition(optimizer, field) for field in ('message_body', 'subject', 'from_address')]
+
+    assert fields(optimizer.order(compiled, 'all')) == ['from_address', 'subject', 'message_body']
+    assert fields(optimizer.order(compiled, 'any')) == ['from_address', 'subject', 'message_body']
+
+
+def test_all_prefers_conditions_likely_to_fail_and_any_prefers_likely_to_pass():
+    optimizer = ConditionOptimizer()
+    rarely_matches = compile_condition(optimizer, 'subject', value='rare')
+    usually_matches = compile_condition(optimizer, 'subject', value='common')
+    set_stats(optimizer, rarely_matches, 100, 2)
+    set_stats(optimizer, usually_matches, 100, 98)
+    compiled = [usually_matches, rarely_matches]
+
+    assert optimizer.order(compiled, 'all') == [rarely_matches, usually_matches]
+    assert optimizer.order(compiled, 'any') == [usually_matches, rarely_matches]
+
+
+def test_selectivity_can_outweigh_static_cost():
+    optimizer = ConditionOptimizer()
+    cheap_but_passes = compile_condition(optimizer, 'from_address')
+    body_rarely_matches = compile_condition(optimizer, 'message_body')
+    set_stats(optimizer, cheap_but_passes, 1000, 999)
+    set_stats(optimizer, body_rarely_matches, 1000, 0)
+
+    assert optimizer.order([cheap_but_passes, body_rarely_matches], 'all') == [body_rarely_matches, cheap_but_passes]
+
+
+def test_unknown_predicates_go_first_for_all_and_last_for_any():
+    optimizer = ConditionOptimizer()
+    known = compile_condition(optimizer, 'from_address')
+    unknown = compile_condition(optimizer, 'message_body', predicate_name='nope', predicate=None)
+
+    assert unknown.cost == 0.0
+    assert optimizer.order([known, unknown], 'all') == [unknown, known]
+    assert optimizer.order([unknown, known], 'any') == [known, unknown]
+
+
+def test_stats_round_trip(tmp_path):
+    stats_path = tmp_path / 'condition_stats.json'
+    optimizer = ConditionOptimizer(str(stats_path))
+    condition = compile_condition(optimizer, 'subject', value=['a', 'b'])
+    for result in (True, False, False):
+        optimizer.record(condition, result)
+    optimizer.save()
+
+    reloaded = ConditionOptimizer(str(stats_path))
+    stats = reloaded.stats[condition.key]
+
+    assert (stats.field, stats.predicate, stats.value) == ('subject', 'contains', ['a', 'b'])
+    assert (stats.evaluations, stats.matches) == (3, 1)
+    assert compile_condition(reloaded, 'subject', value=['a', 'b']).key == condition.key
+    assert not (tmp_path / 'condition_stats.json.tmp').exists()
+
+
+def test_unreadable_stats_file_starts_empty(tmp_path, capsys):
+    stats_path = tmp_path / 'condition_stats.json'
+    stats_path.write_text('{not json')
+
+    optimizer = ConditionOptimizer(str(stats_path))
+
+    assert optimizer.stats == {}
+    assert 'Error loading condition stats' in capsys.readouterr().out
+
+
+def test_save_without_path_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    optimizer = ConditionOptimizer()
+    optimizer.record(compile_condition(optimizer, 'subject'), True)
+
+    optimizer.save()
+
+    assert list(tmp_path.iterdir()) == []
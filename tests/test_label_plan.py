@@ -0,0 +1,130 @@
+import pytest
+
+from actions.plan import LabelChangePlan
+from db.database import DatabaseManager
+from db.models import RuleExecutionLog
+from email_repository import EmailRepository
+from rule_engine import RuleEngine
+
+
+class FakeGmailClient:
+    def __init__(self, labels=None, modify_succeeds=True):
+        self.labels = {name.lower(): label_id for name, label_id in (labels or {}).items()}
+        self.modify_succeeds = modify_succeeds
+        self.modify_calls = []
+
+    def get_label_id(self, label_name):
+        return self.labels.get(label_name.lower())
+
+    def modify_labels(self, message_id, add_label_ids=None, remove_label_ids=None):
+        self.modify_calls.append((message_id, list(add_label_ids or []), list(remove_label_ids or [])))
+        return self.modify_succeeds
+
+
+def rule(name, *actions, value='example.com'):
+    return {
+        'name': name,
+        'predicate': 'all',
+        'conditions': [{'field': 'from', 'predicate': 'contains', 'value': value}],
+        'actions': [{'action': action, 'params': params} for action, params in actions]
+    }
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'rules.db'}")
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def session(db_manager):
+    session = db_manager.get_session()
+    EmailRepository(session).save_email({'id': 'm1', 'from_address': 'news@example.com', 'is_read': False})
+    return session
+
+
+def run_merged(session, gmail_client, rules):
+    repo = EmailRepository(session)
+    RuleEngine(gmail_client, session, merge_actions=True).process_rules(rules, [repo.get_email_snapshot('m1')])
+    session.expire_all()
+    logs = {log.rule_name: log for log in session.query(RuleExecutionLog).all()}
+    return repo.get_email_by_id('m1'), logs
+
+
+def test_last_matching_rule_wins_read_state():
+    plan = LabelChangePlan(current_is_read=True)
+    plan.mark_unread()
+    plan.mark_read()
+    plan.mark_unread()
+
+    assert plan.read_state is False
+    assert plan.changes_read_state()
+
+
+def test_no_op_changes_are_dropped():
+    plan = LabelChangePlan(current_is_read=True)
+    plan.mark_read()
+
+    assert plan.is_empty()
+    assert plan.apply('m1', FakeGmailClient()) == {
+        'success': True, 'modified': True, 'email_id': 'm1', 'add_label_ids': [], 'remove_label_ids': []
+    }
+
+
+def test_apply_sends_one_modify_call_and_reports_missing_labels():
+    gmail_client = FakeGmailClient(labels={'Work': 'L1'})
+    plan = LabelChangePlan(current_is_read=False)
+    plan.mark_read()
+    plan.add_label('Work')
+    plan.add_label('work')
+    plan.add_label('Nope')
+
+    result = plan.apply('m1', gmail_client)
+
+    assert gmail_client.modify_calls == [('m1', ['L1'], ['UNREAD'])]
+    assert result['modified'] is True
+    assert result['success'] is False
+    assert result['missing_labels'] == ['Nope']
+
+
+def test_merged_rules_apply_net_change(session):
+    gmail_client = FakeGmailClient(labels={'Work': 'L1'})
+    rules = [
+        rule('read', ('mark_as_read', {})),
+        rule('unread', ('mark_as_unread', {})),
+        rule('read again', ('mark_as_read', {}), ('move_message', {'label': 'Work'})),
+    ]
+
+    email, logs = run_merged(session, gmail_client, rules)
+
+    assert gmail_client.modify_calls == [('m1', ['L1'], ['UNREAD'])]
+    assert email.is_read is True
+    assert {name: log.execution_status for name, log in logs.items()} == {
+        'read': 'success', 'unread': 'success', 'read again': 'success'
+    }
+
+
+def test_failed_modify_leaves_state_and_logs_errors(session):
+    gmail_client = FakeGmailClient(modify_succeeds=False)
+
+    email, logs = run_merged(session, gmail_client, [rule('read', ('mark_as_read', {}))])
+
+    assert email.is_read is False
+    assert logs['read'].execution_status == 'error'
+    assert logs['read'].actions_performed[0]['success'] is False
+
+
+def test_missing_label_only_fails_the_rule_that_asked_for_it(session):
+    gmail_client = FakeGmailClient()
+    rules = [
+        rule('read', ('mark_as_read', {})),
+        rule('move', ('move_message', {'label': 'Nope'})),
+    ]
+
+    email, logs = run_merged(session, gmail_client, rules)
+
+    assert email.is_read is True
+    assert logs['read'].execution_status == 'success'
+    assert logs['move'].execution_status == 'error'
+    assert logs['move'].error_message == 'Label not found: Nope'
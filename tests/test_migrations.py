@@ -0,0 +1,68 @@
+import sqlite3
+
+from db.database import DatabaseManager
+from email_repository import EmailRepository
+
+
+def create_pre_account_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE emails (
+            id VARCHAR(255) PRIMARY KEY,
+            thread_id VARCHAR(255),
+            from_address VARCHAR(500),
+            to_addresses TEXT,
+            cc_addresses TEXT,
+            bcc_addresses TEXT,
+            subject TEXT,
+            message_body TEXT,
+            snippet TEXT,
+            date_received DATETIME,
+            labels JSON,
+            is_read BOOLEAN,
+            is_starred BOOLEAN,
+            has_attachments BOOLEAN,
+            raw_headers JSON,
+            created_at DATETIME,
+            updated_at DATETIME
+        );
+        CREATE INDEX ix_emails_subject ON emails (subject);
+        CREATE TABLE rule_execution_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email_id VARCHAR(255),
+            rule_name VARCHAR(255),
+            rule_conditions JSON,
+            actions_performed JSON,
+            execution_status VARCHAR(50),
+            error_message TEXT,
+            executed_at DATETIME
+        );
+        INSERT INTO emails (id, from_address, subject, is_read) VALUES ('m1', 'a@b.com', 'Hello', 0);
+        INSERT INTO rule_execution_logs (email_id, rule_name, execution_status) VALUES ('m1', 'r', 'success');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def test_pre_account_database_is_migrated(tmp_path):
+    db_path = tmp_path / 'old.db'
+    create_pre_account_db(db_path)
+
+    db_manager = DatabaseManager(f'sqlite:///{db_path}')
+    try:
+        snapshots = EmailRepository(db_manager.get_session()).get_email_snapshots()
+        assert [(snapshot.id, snapshot.subject) for snapshot in snapshots] == [('m1', 'hello')]
+
+        assert db_manager.ingest_emails([{'id': 'm1', 'subject': 'Updated'}], 'other').result() == 1
+    finally:
+        db_manager.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT account, id FROM emails ORDER BY account').fetchall() == [
+        ('default', 'm1'), ('other', 'm1')
+    ]
+    assert conn.execute('SELECT account FROM rule_execution_logs').fetchall() == [('default',)]
+    conn.close()
+
+    # Running again on an already migrated database is a no-op.
+    DatabaseManager(f'sqlite:///{db_path}').close()
@@ -0,0 +1,104 @@
+import base64
+
+from mime_body import MessageBodyExtractor, html_to_text
+
+
+def encode(text, charset='utf-8'):
+    return base64.urlsafe_b64encode(text.encode(charset)).decode().rstrip('=')
+
+
+def text_part(mime_type, text, charset=None):
+    part = {'mimeType': mime_type, 'body': {'data': encode(text, charset or 'utf-8')}}
+    if charset:
+        part['headers'] = [{'name': 'Content-Type', 'value': f'{mime_type}; charset="{charset}"'}]
+    return part
+
+
+def test_prefers_plain_part_nested_in_mixed_alternative():
+    payload = {
+        'mimeType': 'multipart/mixed',
+        'parts': [
+            {
+                'mimeType': 'multipart/alternative',
+                'parts': [
+                    text_part('text/html', '<p>Hello <b>html</b></p>'),
+                    text_part('text/plain', 'Hello plain'),
+                ]
+            },
+            {'mimeType': 'application/pdf', 'filename': 'invoice.pdf', 'body': {'attachmentId': 'A1', 'size': 10}},
+        ]
+    }
+
+    assert MessageBodyExtractor().extract(payload) == ('Hello plain', True)
+
+
+def test_falls_back_to_stripped_html():
+    payload = {
+        'mimeType': 'multipart/alternative',
+        'parts': [
+            text_part('text/html', '<html><head><style>p {}</style></head>'
+                                   '<body><p>Hi &amp; bye</p><script>x()</script>end</body></html>'),
+        ]
+    }
+
+    assert MessageBodyExtractor().extract(payload) == ('Hi & bye\nend', False)
+
+
+def test_other_text_types_do_not_replace_plain_body():
+    payload = {
+        'mimeType': 'multipart/mixed',
+        'parts': [
+            {
+                'mimeType': 'multipart/alternative',
+                'parts': [
+                    text_part('text/x-amp-html', '<amp>'),
+                    text_part('text/plain', 'Plain body'),
+                ]
+            },
+            text_part('text/calendar', 'BEGIN:VCALENDAR'),
+        ]
+    }
+
+    assert MessageBodyExtractor().extract(payload) == ('Plain body', False)
+
+
+def test_top_level_payload_without_parts():
+    payload = text_part('text/plain', 'Single part')
+
+    assert MessageBodyExtractor().extract(payload) == ('Single part', False)
+
+
+def test_honours_part_charset():
+    payload = {'mimeType': 'multipart/alternative', 'parts': [text_part('text/plain', 'café', 'iso-8859-1')]}
+
+    assert MessageBodyExtractor().extract(payload)[0] == 'café'
+
+
+def test_truncates_to_max_body_bytes():
+    payload = text_part('text/plain', 'abcdefghij' * 100)
+
+    body, _ = MessageBodyExtractor(max_body_bytes=25).extract(payload)
+
+    assert body == ('abcdefghij' * 3)[:25]
+
+
+def test_html_style_block_longer_than_limit_does_not_use_up_the_body():
+    html = '<html><head><style>' + 'p { color: red; }' * 20 + '</style></head><body><p>' + 'word ' * 50 + '</p></body></html>'
+    payload = {'mimeType': 'multipart/alternative', 'parts': [text_part('text/html', html)]}
+
+    body, _ = MessageBodyExtractor(max_body_bytes=100).extract(payload)
+
+    assert body == ('word ' * 20)[:100]
+
+
+def test_attachment_without_body_parts():
+    payload = {
+        'mimeType': 'multipart/mixed',
+        'parts': [{'mimeType': 'image/png', 'filename': 'a.png', 'body': {'attachmentId': 'X', 'size': 5}}]
+    }
+
+    assert MessageBodyExtractor().extract(payload) == ('', True)
+
+
+def test_html_to_text_collapses_whitespace():
+    assert html_to_text('<div>  one\n two </div><br><p>three</p>') == 'one two\nthree'
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+
+from db.models import Email
+from email_snapshot import EmailSnapshot
+from predicates.pattern_predicates import DomainInPredicate, InListPredicate
+from rule_engine import RuleEngine
+
+EMAIL_VALUES = {
+    'id': 'm1',
+    'from_address': 'Alice Smith <Alice@Mail.Example.com>',
+    'to_addresses': 'bob@example.org, "Carol, C." <carol@corp.io>',
+    'subject': 'Invoice #1234 due',
+    'message_body': 'Please pay invoice 1234.',
+    'snippet': None,
+    'date_received': datetime(2024, 5, 3, 10, 0, 0),
+    'is_read': False,
+}
+
+
+def condition(field, predicate, value):
+    return [{'field': field, 'predicate': predicate, 'value': value}]
+
+
+@pytest.mark.parametrize('field_value, expected', [
+    ('alice@example.com', True),
+    ('Alice <ALICE@example.com>', True),
+    ('someone@else.com, alice@example.com', True),
+    ('"Example, Alice" <alice@example.com>', True),
+    ('malice@example.com', False),
+    (None, False),
+])
+def test_in_list_parses_addresses(field_value, expected):
+    assert InListPredicate().evaluate(field_value, ['alice@example.com', 'bob@example.com']) is expected
+
+
+def test_in_list_matches_whole_field():
+    assert InListPredicate().evaluate('Weekly Digest', 'weekly digest, daily digest')
+
+
+@pytest.mark.parametrize('field_value, expected', [
+    ('news@example.com', True),
+    ('news@mail.example.com', True),
+    ('news@a.b.example.com', True),
+    ('news@badexample.com', False),
+    ('news@example.com.evil.io', False),
+    ('not an address', False),
+])
+def test_domain_in_walks_parent_domains(field_value, expected):
+    assert DomainInPredicate().evaluate(field_value, ['example.com']) is expected
+
+
+def test_domain_in_strips_leading_at():
+    assert DomainInPredicate().evaluate('news@example.com', '@example.com')
+
+
+@pytest.mark.parametrize('predicate', [InListPredicate(), DomainInPredicate()])
+def test_list_and_comma_separated_values_are_equivalent(predicate):
+    assert predicate.prepare(['Example.com', ' corp.io ']) == predicate.prepare('example.com, corp.io,')
+
+
+def test_invalid_regex_fails_the_condition_without_raising(capsys):
+    engine = RuleEngine(None, None)
+    conditions = condition('subject', 'matches_regex', '(unclosed')
+
+    compiled = engine._compile_conditions(conditions, 'all')
+
+    assert compiled[0].predicate is None
+    assert "Invalid regex" in capsys.readouterr().out
+    assert not engine._evaluate_conditions(conditions, 'all', EmailSnapshot(**EMAIL_VALUES))
+
+
+@pytest.mark.parametrize('conditions, expected', [
+    (condition('subject', 'matches_regex', r'invoice #\d+'), True),
+    (condition('subject', 'matches_regex', r'^receipt'), False),
+    (condition('message', 'matches_regex', r'PAY\s+invoice'), True),
+    (condition('from', 'in_list', ['alice@mail.example.com']), True),
+    (condition('from', 'in_list', 'bob@example.org'), False),
+    (condition('to', 'in_list', 'CAROL@corp.io'), True),
+    (condition('from', 'domain_in', 'example.com'), True),
+    (condition('to', 'domain_in', ['corp.io']), True),
+    (condition('to', 'domain_in', 'example.com'), False),
+    (condition('snippet', 'in_list', 'anything'), False),
+    (condition('snippet', 'domain_in', 'example.com'), False),
+])
+def test_snapshot_and_orm_paths_agree(conditions, expected):
+    engine = RuleEngine(None, None)
+
+    orm_result = engine._evaluate_conditions(conditions, 'all', Email(**EMAIL_VALUES))
+    snapshot_result = engine._evaluate_conditions(conditions, 'all', EmailSnapshot(**EMAIL_VALUES))
+
+    assert orm_result is snapshot_result is expected
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from run_accounts import load_accounts, process_account
+
+
+def write_accounts(tmp_path, accounts):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps(accounts))
+    return str(path)
+
+
+def test_load_accounts(tmp_path):
+    accounts = [{'account': 'a', 'token_path': 'a.json'}, {'account': 'b', 'token_path': 'b.json'}]
+
+    assert load_accounts(write_accounts(tmp_path, accounts)) == accounts
+
+
+def test_load_accounts_requires_token_path(tmp_path):
+    with pytest.raises(ValueError, match="needs a 'token_path'"):
+        load_accounts(write_accounts(tmp_path, [{'account': 'a'}]))
+
+
+def test_load_accounts_rejects_shared_token_path(tmp_path):
+    accounts = [{'account': 'a', 'token_path': 'token.json'}, {'account': 'b', 'token_path': './token.json'}]
+
+    with pytest.raises(ValueError, match='share token_path'):
+        load_accounts(write_accounts(tmp_path, accounts))
+
+
+def test_process_account_fails_without_token_instead_of_prompting(tmp_path):
+    account = {'account': 'a', 'token_path': str(tmp_path / 'missing_token.json'),
+               'credentials_path': str(tmp_path / 'credentials.json')}
+
+    summary = process_account(account, {'database_url': f"sqlite:///{tmp_path / 'rules.db'}"})
+
+    assert 'No valid or refreshable token' in summary['error']
+    assert summary['fetched'] == 0
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+
+from db.models import Email
+from email_snapshot import EmailSnapshot
+from rule_engine import RuleEngine
+
+EMAIL_VALUES = {
+    'id': 'm1',
+    'from_address': 'Alice <Alice@Example.com>',
+    'to_addresses': 'bob@example.org',
+    'subject': 'Quarterly Report',
+    'message_body': 'Please find the REPORT attached.',
+    'snippet': None,
+    'date_received': datetime(2024, 5, 3, 10, 0, 0),
+    'is_read': False,
+}
+
+CONDITIONS = [
+    ('from', 'contains', 'alice@EXAMPLE'),
+    ('from', 'does_not_contain', 'carol'),
+    ('subject', 'equals', 'quarterly report'),
+    ('subject', 'does_not_equal', 'Quarterly Report'),
+    ('message', 'contains', 'report'),
+    ('snippet', 'contains', 'anything'),
+    ('snippet', 'does_not_contain', 'anything'),
+    ('date_received', 'contains', '2024-05'),
+    ('date_received', 'does_not_contain', '2023'),
+    ('date_received', 'equals', '2024-05-03 10:00:00'),
+    ('date_received', 'does_not_equal', '2024-05-03 10:00:00'),
+]
+
+
+@pytest.mark.parametrize('field, predicate, value', CONDITIONS)
+def test_snapshot_and_orm_paths_agree(field, predicate, value):
+    engine = RuleEngine(None, None)
+    conditions = [{'field': field, 'predicate': predicate, 'value': value}]
+
+    orm_result = engine._evaluate_conditions(conditions, 'all', Email(**EMAIL_VALUES))
+    snapshot_result = engine._evaluate_conditions(conditions, 'all', EmailSnapshot(**EMAIL_VALUES))
+
+    assert orm_result == snapshot_result
+
+
+def test_date_received_string_conditions_match():
+    engine = RuleEngine(None, None)
+    snapshot = EmailSnapshot(**EMAIL_VALUES)
+
+    assert engine._evaluate_conditions(
+        [{'field': 'date_received', 'predicate': 'contains', 'value': '2024-05'}], 'all', snapshot
+    )
+    assert engine._evaluate_conditions(
+        [{'field': 'date_received', 'predicate': 'equals', 'value': '2024-05-03 10:00:00'}], 'all', snapshot
+    )